@@ -4,31 +4,168 @@ Interactive setup wizard for configuring the CodeWars MCP server,
 including user authentication, data synchronization, and VS Code integration.
 """
 
+import asyncio
 import json
+import mmap
+import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _slurp(path: Path) -> Optional[bytes]:
+    """Read a file's bytes with a single open/fstat/read sequence.
+
+    Avoids the separate stat from an exists() check followed by another
+    open/read, and opens with O_CLOEXEC so the descriptor cannot leak
+    into any process the wizard spawns.
+
+    Args:
+        path: File to read.
+
+    Returns:
+        File contents as bytes, or None if the file does not exist.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    except FileNotFoundError:
+        return None
+    try:
+        remaining = os.fstat(fd).st_size
+        chunks = []
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _loads_mmapped(path: Path) -> Any:
+    """Parse a JSON file with orjson through a read-only memory map.
+
+    orjson consumes the mapped buffer directly, so bytes flow from the
+    page cache into the parser without the intermediate copy and UTF-8
+    decode that read_text() would pay. Requires orjson.
+
+    Args:
+        path: JSON file to parse.
+
+    Returns:
+        Parsed JSON payload.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+    finally:
+        os.close(fd)
+
+
+def _dump_json_bytes(obj: Any) -> bytes:
+    """Serialize to pretty-printed JSON bytes, via orjson when available.
+
+    Args:
+        obj: JSON-serializable object.
+
+    Returns:
+        UTF-8 encoded, 2-space indented JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def _dump_json_compact(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, via orjson when available.
+
+    Used for machine-read files like the kata history, where indentation
+    only inflates the serialized string and the bytes on disk.
+
+    Args:
+        obj: JSON-serializable object.
+
+    Returns:
+        UTF-8 encoded JSON bytes without whitespace.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
 project_root = Path(__file__).parent.resolve()
 sys.path.insert(0, str(project_root / "src"))
 
 try:
-    from api_client import fetch_codewars_user, fetch_user_completed
+    from api_client import (
+        CodeWarsAPIError,
+        fetch_codewars_user,
+        fetch_user_completed_all,
+        fetch_user_completed_raw,
+        prefetch_kata_details,
+        warm_connection,
+    )
 except ImportError as e:
     print("❌ Error crítico: No se pudo importar api_client.py")
     print(f"   Detalle: {e}")
     sys.exit(1)
 
 
+# Color only when writing to a real terminal; redirected or CI output
+# gets plain text. NO_COLOR (https://no-color.org) is honored too.
+# Decided at import time so the precompiled banners below inherit it.
+_USE_COLOR = sys.stdout.isatty() and "NO_COLOR" not in os.environ
+
+
 class Colors:
-    """ANSI color codes for terminal output."""
-    GREEN = "\033[92m"
-    CYAN = "\033[96m"
-    YELLOW = "\033[93m"
-    RED = "\033[91m"
-    BOLD = "\033[1m"
-    RESET = "\033[0m"
+    """ANSI color codes for terminal output (empty when color is off)."""
+    GREEN = "\033[92m" if _USE_COLOR else ""
+    CYAN = "\033[96m" if _USE_COLOR else ""
+    YELLOW = "\033[93m" if _USE_COLOR else ""
+    RED = "\033[91m" if _USE_COLOR else ""
+    BOLD = "\033[1m" if _USE_COLOR else ""
+    RESET = "\033[0m" if _USE_COLOR else ""
+
+
+# Banners are static, so they are formatted and encoded once at import
+# time and written to stdout in a single call.
+_HEADER = (
+    f"\n{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n"
+    f"{Colors.BOLD}{Colors.GREEN}🚀 CodeWars MCP - Asistente de Instalación{Colors.RESET}\n"
+    f"{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n\n"
+).encode("utf-8")
+
+_NEXT_STEPS = (
+    f"\n{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n"
+    f"{Colors.BOLD}{Colors.GREEN}✨ INSTALACIÓN COMPLETADA ✨{Colors.RESET}\n"
+    f"{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n\n"
+    f"{Colors.BOLD}Próximos pasos:{Colors.RESET}\n"
+    f"  1. {Colors.CYAN}Reinicia VS Code{Colors.RESET}\n"
+    f"  2. {Colors.CYAN}Abre GitHub Copilot Chat{Colors.RESET}\n"
+    f"  3. {Colors.CYAN}Escribe: '@codewars-tutor dame un ejercicio'{Colors.RESET}\n\n"
+    f"{Colors.YELLOW}Nota:{Colors.RESET} Si tienes problemas, verifica:\n"
+    f"  • Que tienes instalada la extensión de GitHub Copilot\n"
+    f"  • Que MCP está habilitado en tu configuración de VS Code\n\n"
+).encode("utf-8")
 
 
 class SetupWizard:
@@ -40,31 +177,91 @@ class SetupWizard:
         self.data_dir = self.project_root / "data"
         self.vscode_dir = self.project_root / ".vscode"
         self.index_file = self.data_dir / "katas_index.json"
+        self.index_meta_file = self.data_dir / ".katas_index.meta"
         self.config_file = self.data_dir / "config.json"
         self.history_file = self.data_dir / "user_history.json"
-        
+        self._pending_writes: List[Tuple[Path, bytes]] = []
+
+    def _queue_write(self, path: Path, data: bytes) -> None:
+        """Queue a file write to be flushed as one batch at the end of setup.
+
+        Args:
+            path: Destination file path.
+            data: File content as bytes.
+        """
+        self._pending_writes.append((path, data))
+
+    def _flush_writes(self) -> List[Path]:
+        """Write all queued files concurrently.
+
+        Dispatching the blocking writes to a thread pool lets the kernel
+        service them in parallel, so total latency approaches the slowest
+        single write instead of their sum.
+
+        Returns:
+            List of paths whose write failed (empty on full success).
+        """
+        if not self._pending_writes:
+            return []
+
+        failed: List[Path] = []
+        with ThreadPoolExecutor(max_workers=len(self._pending_writes)) as pool:
+            futures = {
+                pool.submit(path.write_bytes, data): path
+                for path, data in self._pending_writes
+            }
+            for future, path in futures.items():
+                try:
+                    future.result()
+                except OSError as e:
+                    self.print_error(f"Error al escribir {path}: {e}")
+                    failed.append(path)
+
+        self._pending_writes.clear()
+        return failed
+
     def print_header(self) -> None:
         """Display welcome banner."""
-        print(f"\n{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}")
-        print(f"{Colors.BOLD}{Colors.GREEN}🚀 CodeWars MCP - Asistente de Instalación{Colors.RESET}")
-        print(f"{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n")
-        
+        self._write_banner(_HEADER)
+
+    @staticmethod
+    def _write_banner(banner: bytes) -> None:
+        """Emit a pre-encoded banner with a single buffered write.
+
+        Args:
+            banner: Banner bytes prepared at import time.
+        """
+        sys.stdout.flush()
+        sys.stdout.buffer.write(banner)
+        sys.stdout.buffer.flush()
+
+    @staticmethod
+    def _emit(color: str, glyph: str, message: str) -> None:
+        """Write one colored status line with a single stdout write.
+
+        Args:
+            color: ANSI color prefix.
+            glyph: Status symbol shown before the message.
+            message: Text to display.
+        """
+        sys.stdout.write(f"{color}{glyph} {message}{Colors.RESET}\n")
+
     def print_success(self, message: str) -> None:
         """Print success message in green."""
-        print(f"{Colors.GREEN}✓ {message}{Colors.RESET}")
-        
+        self._emit(Colors.GREEN, "✓", message)
+
     def print_error(self, message: str) -> None:
         """Print error message in red."""
-        print(f"{Colors.RED}✗ {message}{Colors.RESET}")
-        
+        self._emit(Colors.RED, "✗", message)
+
     def print_warning(self, message: str) -> None:
         """Print warning message in yellow."""
-        print(f"{Colors.YELLOW}⚠ {message}{Colors.RESET}")
-        
+        self._emit(Colors.YELLOW, "⚠", message)
+
     def print_info(self, message: str) -> None:
         """Print info message in cyan."""
-        print(f"{Colors.CYAN}ℹ {message}{Colors.RESET}")
-        
+        self._emit(Colors.CYAN, "ℹ", message)
+
     def ensure_directories(self) -> bool:
         """Create required directories if they don't exist.
         
@@ -84,13 +281,53 @@ class SetupWizard:
             self.print_error(f"Error al crear directorios: {e}")
             return False
             
+    def _load_index_meta(self, index_stat: os.stat_result) -> Optional[int]:
+        """Return the cached kata count if the index file is unchanged.
+
+        Args:
+            index_stat: Current stat() of katas_index.json.
+
+        Returns:
+            Cached entry count when mtime and size match the last parse,
+            None when the index changed or no valid meta file exists.
+        """
+        try:
+            meta = json.loads(self.index_meta_file.read_text(encoding="utf-8"))
+            if (meta.get("mtime_ns") == index_stat.st_mtime_ns
+                    and meta.get("size") == index_stat.st_size):
+                return meta["count"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def _store_index_meta(self, index_stat: os.stat_result, count: int) -> None:
+        """Record the index fingerprint so the next run can skip parsing.
+
+        Args:
+            index_stat: stat() of katas_index.json taken before the parse.
+            count: Number of katas counted in the index.
+        """
+        meta = {
+            "mtime_ns": index_stat.st_mtime_ns,
+            "size": index_stat.st_size,
+            "count": count,
+        }
+        try:
+            tmp_file = self.index_meta_file.with_name(".katas_index.meta.tmp")
+            tmp_file.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp_file, self.index_meta_file)
+        except OSError:
+            pass  # The meta cache is best-effort.
+
     def verify_index(self) -> bool:
         """Verify kata index file exists and is valid.
         
         Returns:
             True if index exists and is valid, False otherwise.
         """
-        if not self.index_file.exists():
+        try:
+            index_stat = self.index_file.stat()
+        except FileNotFoundError:
             self.print_warning(
                 "No se encontró 'katas_index.json' en el directorio data/"
             )
@@ -99,15 +336,31 @@ class SetupWizard:
                 "'python src/indexer.py'"
             )
             return False
-            
+
         try:
-            index_data = json.loads(self.index_file.read_text(encoding="utf-8"))
-            kata_count = len(index_data)
+            cached_count = self._load_index_meta(index_stat)
+            if cached_count is not None:
+                self.print_success(
+                    f"Base de datos cargada: {cached_count} ejercicios disponibles"
+                )
+                return True
+
+            if ijson is not None:
+                # Stream the top-level array so we count entries without
+                # materializing the whole index in memory.
+                with self.index_file.open("rb") as index_stream:
+                    kata_count = sum(1 for _ in ijson.items(index_stream, "item"))
+            elif orjson is not None:
+                kata_count = len(_loads_mmapped(self.index_file))
+            else:
+                kata_count = len(json.loads(_slurp(self.index_file)))
+
+            self._store_index_meta(index_stat, kata_count)
             self.print_success(
                 f"Base de datos cargada: {kata_count} ejercicios disponibles"
             )
             return True
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             self.print_error(f"El archivo katas_index.json está corrupto: {e}")
             return False
         except Exception as e:
@@ -123,40 +376,47 @@ class SetupWizard:
         print(f"\n{Colors.BOLD}{'─'*60}{Colors.RESET}")
         print(f"{Colors.BOLD}Paso 1: Configuración de Usuario{Colors.RESET}")
         print(f"{Colors.BOLD}{'─'*60}{Colors.RESET}\n")
-        
+
+        # Establish the TLS session while the user types, so the first
+        # validation request only pays the API round-trip.
+        threading.Thread(target=warm_connection, daemon=True).start()
+
         max_attempts = 3
         attempt = 0
-        
+        validated: Dict[str, Dict[str, Any]] = {}
+
         while attempt < max_attempts:
             username = input(f"{Colors.CYAN}👤 Ingresa tu usuario de CodeWars: {Colors.RESET}").strip()
-            
+
             if not username:
                 self.print_warning("El nombre de usuario no puede estar vacío")
                 continue
-                
+
             attempt += 1
             print(f"{Colors.CYAN}⏳ Validando usuario '{username}'...{Colors.RESET}")
-            
-            user_data = fetch_codewars_user(username)
-            
-            if "error" in user_data:
-                self.print_error(user_data["error"])
-                
-                if "conexión" in user_data["error"].lower():
+
+            try:
+                # Re-entering the same name (e.g. after a typo elsewhere)
+                # reuses the earlier validation instead of a new request.
+                user_data = validated.get(username) or fetch_codewars_user(username)
+                validated[username] = user_data
+            except CodeWarsAPIError as e:
+                self.print_error(str(e))
+
+                if e.kind == "connection":
+                    # The client already retried with backoff; a connection
+                    # error here means the network is really down.
                     self.print_warning(
-                        "Verifica tu conexión a internet e intenta nuevamente"
+                        "Los reintentos automáticos fallaron. Verifica tu "
+                        "conexión a internet y ejecuta el asistente de nuevo."
                     )
-                    retry = input(f"{Colors.CYAN}¿Reintentar? (s/n): {Colors.RESET}").lower()
-                    if retry != 's':
-                        return None
-                    attempt -= 1
-                    continue
-                    
+                    return None
+
                 remaining = max_attempts - attempt
                 if remaining > 0:
                     self.print_info(f"Intentos restantes: {remaining}")
                 continue
-                
+
             self.print_success(f"Usuario validado: {username}")
             
             if "honor" in user_data:
@@ -181,15 +441,9 @@ class SetupWizard:
         """
         try:
             config_data = {"codewars_username": username}
-            self.config_file.write_text(
-                json.dumps(config_data, indent=2),
-                encoding="utf-8"
-            )
+            self._queue_write(self.config_file, _dump_json_bytes(config_data))
             self.print_success(f"Configuración guardada en {self.config_file}")
             return True
-        except PermissionError:
-            self.print_error(f"Sin permisos para escribir en {self.config_file}")
-            return False
         except Exception as e:
             self.print_error(f"Error al guardar configuración: {e}")
             return False
@@ -204,27 +458,64 @@ class SetupWizard:
             True if successful, False otherwise.
         """
         print(f"\n{Colors.CYAN}⏳ Sincronizando historial de katas completados...{Colors.RESET}")
-        
-        history_data = fetch_user_completed(username, page=0)
-        
-        if history_data and "error" in history_data[0]:
-            self.print_error(history_data[0]["error"])
-            self.print_warning("Se continuará sin historial sincronizado")
-            return False
-            
+
         try:
-            self.history_file.write_text(
-                json.dumps(history_data, indent=2),
-                encoding="utf-8"
+            history_bytes, completed_count, total_pages = (
+                fetch_user_completed_raw(username)
             )
+        except CodeWarsAPIError as e:
+            self.print_error(str(e))
+            self.print_warning("Se continuará sin historial sincronizado")
+            return False
+
+        if total_pages > 1:
+            # Multi-page histories must be merged, which requires parsing.
+            try:
+                history_data = asyncio.run(fetch_user_completed_all(username))
+            except CodeWarsAPIError as e:
+                self.print_error(str(e))
+                self.print_warning("Se continuará sin historial sincronizado")
+                return False
+
+            history_bytes = _dump_json_compact(history_data)
             completed_count = len(history_data)
+
+        try:
+            self._queue_write(self.history_file, history_bytes)
             self.print_success(
                 f"Historial sincronizado: {completed_count} katas completados"
             )
-            return True
         except Exception as e:
             self.print_error(f"Error al guardar historial: {e}")
             return False
+
+        self._prefetch_kata_cache(history_bytes)
+        return True
+
+    def _prefetch_kata_cache(self, history_bytes: bytes) -> None:
+        """Warm the local kata-details cache for the synced history.
+
+        Pulls the kata IDs straight out of the serialized history bytes
+        and prefetches their details concurrently, so later tool calls
+        hit the disk cache instead of the API. Best-effort: any failure
+        just leaves the cache cold.
+
+        Args:
+            history_bytes: Serialized history about to be written to disk.
+        """
+        kata_ids = list(dict.fromkeys(
+            match.decode()
+            for match in re.findall(rb'"id":\s*"([0-9a-f]+)"', history_bytes)
+        ))
+        if not kata_ids:
+            return
+
+        try:
+            self.print_info("Precargando detalles de katas en caché local...")
+            cached_count = asyncio.run(prefetch_kata_details(kata_ids))
+            self.print_success(f"Detalles en caché: {cached_count} katas")
+        except Exception as e:
+            self.print_warning(f"No se pudo precargar la caché de katas: {e}")
             
     def configure_vscode(self) -> bool:
         """Configure VS Code MCP server settings."""
@@ -255,11 +546,8 @@ class SetupWizard:
         try:
             self.vscode_dir.mkdir(parents=True, exist_ok=True)
             settings_file = self.vscode_dir / "settings.json"
-            
-            settings_file.write_text(
-                json.dumps(mcp_config, indent=2),
-                encoding="utf-8"
-            )
+
+            self._queue_write(settings_file, _dump_json_bytes(mcp_config))
             self.print_success(f"VS Code configurado: {settings_file}")
             return True
         except PermissionError:
@@ -271,19 +559,8 @@ class SetupWizard:
             
     def print_next_steps(self) -> None:
         """Display post-installation instructions."""
-        print(f"\n{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}")
-        print(f"{Colors.BOLD}{Colors.GREEN}✨ INSTALACIÓN COMPLETADA ✨{Colors.RESET}")
-        print(f"{Colors.BOLD}{Colors.GREEN}{'='*60}{Colors.RESET}\n")
-        
-        print(f"{Colors.BOLD}Próximos pasos:{Colors.RESET}")
-        print(f"  1. {Colors.CYAN}Reinicia VS Code{Colors.RESET}")
-        print(f"  2. {Colors.CYAN}Abre GitHub Copilot Chat{Colors.RESET}")
-        print(f"  3. {Colors.CYAN}Escribe: '@codewars-tutor dame un ejercicio'{Colors.RESET}\n")
-        
-        print(f"{Colors.YELLOW}Nota:{Colors.RESET} Si tienes problemas, verifica:")
-        print(f"  • Que tienes instalada la extensión de GitHub Copilot")
-        print(f"  • Que MCP está habilitado en tu configuración de VS Code\n")
-        
+        self._write_banner(_NEXT_STEPS)
+
     def run(self) -> int:
         """Execute the complete setup wizard.
         
@@ -294,10 +571,15 @@ class SetupWizard:
         
         if not self.ensure_directories():
             return 1
-            
-        self.verify_index()
-        
-        username = self.configure_user()
+
+        # Index verification is disk-bound and independent of the username
+        # prompt, so run it in the background while the user types; it
+        # finishes long before they press enter.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            index_future = pool.submit(self.verify_index)
+            username = self.configure_user()
+            index_future.result()
+
         if not username:
             self.print_error("Configuración de usuario cancelada o fallida")
             return 1
@@ -311,7 +593,11 @@ class SetupWizard:
             self.print_warning(
                 "Configuración de VS Code falló, pero puedes configurarlo manualmente"
             )
-            
+
+        failed_writes = self._flush_writes()
+        if self.config_file in failed_writes:
+            return 1
+
         self.print_next_steps()
         return 0
 
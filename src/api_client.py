@@ -6,18 +6,245 @@ Includes proper error handling, timeouts, and type hints for production use.
 API Documentation: https://dev.codewars.com
 """
 
-from typing import Dict, List, Any, Union
+import asyncio
+import atexit
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
 import httpx
 
+try:
+    import brotli  # noqa: F401
+    _HAS_BROTLI = True
+except ImportError:
+    _HAS_BROTLI = False
+
 
 BASE_URL = "https://www.codewars.com/api/v1"
 DEFAULT_TIMEOUT = 10.0  # seconds
 MAX_RETRIES = 3
 
+KATA_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "katas"
+KATA_CACHE_TTL = 86400  # seconds; kata metadata changes rarely
+PREFETCH_CONCURRENCY = 16  # parallel requests while warming the cache
+
+_CLIENT: Optional[httpx.Client] = None
+_KATA_MEMO: Dict[str, Dict[str, Any]] = {}
+
+# Static error messages built once instead of on every failure path.
+_ERR_CONNECTION = "Error de conexión. Verifica tu conexión a internet."
+
+# Only advertise brotli when a decoder is actually importable, so the
+# server never sends an encoding we cannot decompress.
+_ACCEPT_ENCODING = "gzip, deflate, br" if _HAS_BROTLI else "gzip, deflate"
+
 
 class CodeWarsAPIError(Exception):
-    """Custom exception for CodeWars API errors."""
-    pass
+    """Custom exception for CodeWars API errors.
+
+    Attributes:
+        kind: Error category, one of "notfound", "connection", "timeout",
+            "http", "parse" or "unexpected". Lets callers branch on the
+            failure class without inspecting the message text.
+    """
+
+    def __init__(self, message: str, kind: str = "http") -> None:
+        super().__init__(message)
+        self.kind = kind
+
+
+def _client() -> httpx.Client:
+    """Return the shared HTTP client, creating it on first use.
+
+    A single keep-alive client reuses TCP+TLS connections across calls,
+    which avoids paying the connection handshake on every request.
+
+    Returns:
+        Module-level httpx.Client configured for the CodeWars API.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.Client(
+            base_url=BASE_URL,
+            timeout=DEFAULT_TIMEOUT,
+            http2=True,
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": _ACCEPT_ENCODING,
+            },
+            transport=httpx.HTTPTransport(retries=MAX_RETRIES),
+        )
+        atexit.register(_CLIENT.close)
+    return _CLIENT
+
+
+def _load_cached_kata(kata_id_or_slug: str) -> Optional[Dict[str, Any]]:
+    """Load a cached kata entry from disk.
+
+    Args:
+        kata_id_or_slug: Kata ID or slug used as the cache key.
+
+    Returns:
+        Cached entry {"etag": str, "cached_at": float, "json": dict},
+        or None if no valid cache entry exists.
+    """
+    cache_file = KATA_CACHE_DIR / f"{kata_id_or_slug}.json"
+    try:
+        entry = json.loads(cache_file.read_text(encoding="utf-8"))
+        if "json" in entry:
+            return entry
+    except (OSError, json.JSONDecodeError):
+        pass
+    return None
+
+
+def _store_cached_kata(
+    kata_id_or_slug: str,
+    etag: Optional[str],
+    payload: Dict[str, Any],
+    last_modified: Optional[str] = None,
+) -> None:
+    """Persist a kata entry to the on-disk cache.
+
+    Args:
+        kata_id_or_slug: Kata ID or slug used as the cache key.
+        etag: ETag header from the API response, if present.
+        payload: Parsed kata details JSON.
+        last_modified: Last-Modified header, if present, for use in
+            If-Modified-Since conditional requests.
+    """
+    try:
+        KATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file = KATA_CACHE_DIR / f"{kata_id_or_slug}.json"
+        cache_file.write_text(
+            json.dumps({
+                "etag": etag,
+                "last_modified": last_modified,
+                "cached_at": time.time(),
+                "json": payload,
+            }),
+            encoding="utf-8"
+        )
+    except OSError:
+        pass  # Cache is best-effort; never fail the fetch over it.
+
+
+def warm_connection() -> None:
+    """Establish the pooled client's TCP+TLS session ahead of time.
+
+    Meant to run on a background thread before the first real request,
+    so the connection handshake overlaps with user input instead of
+    adding to the first fetch's latency. Errors are ignored; the real
+    request will surface them.
+    """
+    try:
+        _client().get("/")
+    except httpx.HTTPError:
+        pass
+
+
+def _request(
+    path: str,
+    *,
+    timeout_msg: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """Issue a GET through the pooled client with shared error handling.
+
+    Connect errors are usually transient, so they retry with exponential
+    backoff before surfacing; network failures map to CodeWarsAPIError
+    with the matching kind. Status-code handling (404, 304,
+    raise_for_status) stays with the caller.
+
+    Args:
+        path: Request path relative to BASE_URL.
+        timeout_msg: Message to raise when the request times out.
+        headers: Extra request headers, if any.
+
+    Returns:
+        The httpx.Response, whatever its status code.
+
+    Raises:
+        CodeWarsAPIError: On timeout or persistent connection failure.
+    """
+    try:
+        for attempt in range(MAX_RETRIES):
+            try:
+                return _client().get(path, headers=headers)
+            except httpx.ConnectError:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(0.2 * 2 ** attempt)
+    except httpx.TimeoutException:
+        raise CodeWarsAPIError(timeout_msg, kind="timeout")
+    except httpx.ConnectError:
+        raise CodeWarsAPIError(_ERR_CONNECTION, kind="connection")
+
+
+def _parse_json(response: httpx.Response) -> Any:
+    """Raise for HTTP error statuses and decode the body as JSON.
+
+    Args:
+        response: Response from _request.
+
+    Returns:
+        Parsed JSON payload.
+
+    Raises:
+        CodeWarsAPIError: On an error status or an undecodable body.
+    """
+    try:
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        raise CodeWarsAPIError(
+            f"Error HTTP {e.response.status_code}: {e.response.text}"
+        )
+    except ValueError as e:
+        raise CodeWarsAPIError(
+            f"Error al parsear respuesta de la API: {e}", kind="parse"
+        )
+
+
+def _get_json(
+    path: str,
+    *,
+    not_found_msg: str,
+    timeout_msg: str,
+    data_envelope: Optional[str] = None,
+) -> Any:
+    """Fetch a path and return its JSON payload.
+
+    Single implementation behind the public fetchers: retry, error
+    mapping and envelope unwrapping all live here, so cross-cutting
+    features (caching, compression, retries) are added in one place
+    instead of three.
+
+    Args:
+        path: Request path relative to BASE_URL.
+        not_found_msg: Message to raise on a 404 response.
+        timeout_msg: Message to raise when the request times out.
+        data_envelope: Optional envelope key to unwrap (e.g. "data" for
+            the paged endpoints); its absence yields an empty list.
+
+    Returns:
+        Parsed JSON payload, unwrapped when data_envelope is given.
+
+    Raises:
+        CodeWarsAPIError: If the resource is missing or the request fails.
+    """
+    response = _request(path, timeout_msg=timeout_msg)
+
+    if response.status_code == 404:
+        raise CodeWarsAPIError(not_found_msg, kind="notfound")
+
+    payload = _parse_json(response)
+    if data_envelope is not None:
+        return payload.get(data_envelope, [])
+    return payload
 
 
 def fetch_codewars_user(username: str) -> Dict[str, Any]:
@@ -44,42 +271,23 @@ def fetch_codewars_user(username: str) -> Dict[str, Any]:
             },
             ...
         }
-        Or error dictionary: {"error": str} if user not found or request fails.
-        
+
+    Raises:
+        CodeWarsAPIError: If the user does not exist or the request fails.
+
     Examples:
         >>> user_data = fetch_codewars_user("johndoe")
         >>> print(user_data["honor"])
         1234
     """
-    url = f"{BASE_URL}/users/{username}"
-    
-    try:
-        with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-            response = client.get(url)
-            
-            if response.status_code == 404:
-                return {"error": f"El usuario '{username}' no existe en CodeWars."}
-            
-            response.raise_for_status()
-            return response.json()
-            
-    except httpx.TimeoutException:
-        return {
-            "error": f"Timeout al conectar con CodeWars API para usuario '{username}'. "
+    return _get_json(
+        f"/users/{username}",
+        not_found_msg=f"El usuario '{username}' no existe en CodeWars.",
+        timeout_msg=(
+            f"Timeout al conectar con CodeWars API para usuario '{username}'. "
             f"Intenta nuevamente."
-        }
-    except httpx.ConnectError:
-        return {
-            "error": "Error de conexión. Verifica tu conexión a internet."
-        }
-    except httpx.HTTPStatusError as e:
-        return {
-            "error": f"Error HTTP {e.response.status_code}: {e.response.text}"
-        }
-    except Exception as e:
-        return {
-            "error": f"Error inesperado al obtener usuario: {e}"
-        }
+        ),
+    )
 
 
 def fetch_user_completed(username: str, page: int = 0) -> List[Dict[str, Any]]:
@@ -104,47 +312,227 @@ def fetch_user_completed(username: str, page: int = 0) -> List[Dict[str, Any]]:
             },
             ...
         ]
-        Or list with single error dictionary: [{"error": str}] on failure.
-        
+
+    Raises:
+        CodeWarsAPIError: If the user does not exist or the request fails.
+
     Examples:
         >>> completed = fetch_user_completed("johndoe", page=0)
         >>> print(len(completed))
         200
     """
-    url = f"{BASE_URL}/users/{username}/code-challenges/completed?page={page}"
-    
+    return _get_json(
+        f"/users/{username}/code-challenges/completed?page={page}",
+        not_found_msg=f"Usuario '{username}' no encontrado.",
+        timeout_msg=(
+            f"Timeout al obtener katas completados de '{username}'. "
+            f"Intenta nuevamente."
+        ),
+        data_envelope="data",
+    )
+
+
+def fetch_user_completed_raw(
+    username: str, page: int = 0
+) -> tuple[bytes, int, int]:
+    """Fetch one page of completed katas as raw JSON bytes.
+
+    Returns the page's `data` array exactly as the API sent it, without
+    parsing it into Python objects, so callers that only persist the
+    payload skip a full JSON parse and re-serialize.
+
+    Args:
+        username: CodeWars username.
+        page: Page number for pagination (0-indexed). Defaults to 0.
+
+    Returns:
+        Tuple of (data_bytes, count, total_pages) where data_bytes is the
+        UTF-8 JSON array of completed katas, count is the number of
+        entries in it, and total_pages comes from the response envelope.
+
+    Raises:
+        CodeWarsAPIError: If the user does not exist or the request fails.
+
+    Examples:
+        >>> raw, count, pages = fetch_user_completed_raw("johndoe")
+        >>> Path("history.json").write_bytes(raw)
+    """
+    response = _request(
+        f"/users/{username}/code-challenges/completed?page={page}",
+        timeout_msg=(
+            f"Timeout al obtener katas completados de '{username}'. "
+            f"Intenta nuevamente."
+        ),
+    )
+
+    if response.status_code == 404:
+        raise CodeWarsAPIError(
+            f"Usuario '{username}' no encontrado.", kind="notfound"
+        )
+
     try:
-        with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-            response = client.get(url)
-            
-            if response.status_code == 404:
-                return [{"error": f"Usuario '{username}' no encontrado."}]
-            
-            response.raise_for_status()
-            json_data = response.json()
-            return json_data.get("data", [])
-            
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise CodeWarsAPIError(
+            f"Error HTTP {e.response.status_code}: {e.response.text}"
+        )
+
+    content = response.content
+
+    pages_match = re.search(rb'"totalPages":\s*(\d+)', content)
+    total_pages = int(pages_match.group(1)) if pages_match else 1
+
+    # The envelope is {"totalPages":…,"totalItems":…,"data":[…]} with
+    # the array last, so its bytes can be sliced out directly. Fall
+    # back to a real parse if the shape ever changes.
+    marker = content.find(b'"data":')
+    stripped = content.rstrip()
+    if marker != -1 and stripped.endswith(b']}'):
+        start = content.index(b'[', marker)
+        data_bytes = content[start:stripped.rindex(b']') + 1]
+    else:
+        data_bytes = json.dumps(
+            response.json().get("data", [])
+        ).encode("utf-8")
+
+    return data_bytes, data_bytes.count(b'"id":'), total_pages
+
+
+async def fetch_user_completed_all(username: str) -> List[Dict[str, Any]]:
+    """Fetch every page of completed katas for a user concurrently.
+
+    Retrieves page 0 to learn the total page count, then issues the
+    remaining page requests in parallel over a single HTTP/2 connection,
+    so total wall-clock time stays close to one round-trip regardless of
+    how many pages the user has.
+
+    Args:
+        username: CodeWars username.
+
+    Returns:
+        List of dictionaries with all completed katas across every page,
+        in API order (most recent first).
+
+    Raises:
+        CodeWarsAPIError: If the user does not exist or any request fails.
+
+    Examples:
+        >>> completed = asyncio.run(fetch_user_completed_all("johndoe"))
+        >>> print(len(completed))
+        534
+    """
+    base_path = f"{BASE_URL}/users/{username}/code-challenges/completed"
+
+    try:
+        async with httpx.AsyncClient(
+            http2=True,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        ) as client:
+            first_response = await client.get(f"{base_path}?page=0")
+
+            if first_response.status_code == 404:
+                raise CodeWarsAPIError(
+                    f"Usuario '{username}' no encontrado.", kind="notfound"
+                )
+
+            first_response.raise_for_status()
+            envelope = first_response.json()
+
+            all_katas: List[Dict[str, Any]] = envelope.get("data", [])
+            total_pages = envelope.get("totalPages", 1)
+
+            if total_pages > 1:
+                remaining_responses = await asyncio.gather(*[
+                    client.get(f"{base_path}?page={page}")
+                    for page in range(1, total_pages)
+                ])
+                for response in remaining_responses:
+                    response.raise_for_status()
+                    all_katas.extend(response.json().get("data", []))
+
+            return all_katas
+
     except httpx.TimeoutException:
-        return [{
-            "error": f"Timeout al obtener katas completados de '{username}'. "
-            f"Intenta nuevamente."
-        }]
+        raise CodeWarsAPIError(
+            f"Timeout al obtener katas completados de '{username}'. "
+            f"Intenta nuevamente.",
+            kind="timeout",
+        )
     except httpx.ConnectError:
-        return [{
-            "error": "Error de conexión. Verifica tu conexión a internet."
-        }]
+        raise CodeWarsAPIError(_ERR_CONNECTION, kind="connection")
     except httpx.HTTPStatusError as e:
-        return [{
-            "error": f"Error HTTP {e.response.status_code}: {e.response.text}"
-        }]
+        raise CodeWarsAPIError(
+            f"Error HTTP {e.response.status_code}: {e.response.text}"
+        )
     except (KeyError, ValueError) as e:
-        return [{
-            "error": f"Error al parsear respuesta de la API: {e}"
-        }]
-    except Exception as e:
-        return [{
-            "error": f"Error inesperado al obtener katas completados: {e}"
-        }]
+        raise CodeWarsAPIError(
+            f"Error al parsear respuesta de la API: {e}", kind="parse"
+        )
+
+
+async def prefetch_kata_details(kata_ids: List[str]) -> int:
+    """Warm the on-disk kata cache for many katas concurrently.
+
+    Issues the detail requests in parallel waves bounded by a semaphore,
+    reusing one HTTP/2 connection, so N serial round-trips collapse to
+    roughly N / PREFETCH_CONCURRENCY. Katas with a fresh cache entry are
+    skipped without touching the network, and a 429 response is retried
+    once after honoring Retry-After. Failures are silently ignored: the
+    cache is an optimization, and fetch_kata_details refetches on demand.
+
+    Args:
+        kata_ids: Kata IDs or slugs to cache.
+
+    Returns:
+        Number of katas now present in the cache.
+
+    Examples:
+        >>> asyncio.run(prefetch_kata_details(["5277c8a221e209d3f6000b56"]))
+        1
+    """
+    semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+
+    async def fetch_one(client: httpx.AsyncClient, kata_id: str) -> bool:
+        cached = _load_cached_kata(kata_id)
+        if (cached is not None
+                and time.time() - cached.get("cached_at", 0) < KATA_CACHE_TTL):
+            return True
+
+        async with semaphore:
+            try:
+                response = await client.get(f"/code-challenges/{kata_id}")
+                if response.status_code == 429:
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                    await asyncio.sleep(retry_after)
+                    response = await client.get(f"/code-challenges/{kata_id}")
+                if response.status_code != 200:
+                    return False
+                _store_cached_kata(
+                    kata_id,
+                    response.headers.get("ETag"),
+                    response.json(),
+                    response.headers.get("Last-Modified"),
+                )
+                return True
+            except (httpx.HTTPError, ValueError):
+                return False
+
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        http2=True,
+        timeout=DEFAULT_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=8),
+        headers={
+            "Accept": "application/json",
+            "Accept-Encoding": _ACCEPT_ENCODING,
+        },
+    ) as client:
+        results = await asyncio.gather(*[
+            fetch_one(client, kata_id) for kata_id in kata_ids
+        ])
+
+    return sum(results)
 
 
 def fetch_kata_details(kata_id_or_slug: str) -> Dict[str, Any]:
@@ -181,41 +569,64 @@ def fetch_kata_details(kata_id_or_slug: str) -> Dict[str, Any]:
             "totalStars": int,
             ...
         }
-        Or error dictionary: {"error": str} if kata not found or request fails.
-        
+
+    Raises:
+        CodeWarsAPIError: If the kata does not exist or the request fails.
+
     Examples:
         >>> kata = fetch_kata_details("5277c8a221e209d3f6000b56")
         >>> print(kata["name"])
         'Valid Braces'
     """
-    url = f"{BASE_URL}/code-challenges/{kata_id_or_slug}"
-    
-    try:
-        with httpx.Client(timeout=DEFAULT_TIMEOUT) as client:
-            response = client.get(url)
-            
-            if response.status_code == 404:
-                return {
-                    "error": f"Ejercicio '{kata_id_or_slug}' no encontrado."
-                }
-            
-            response.raise_for_status()
-            return response.json()
-            
-    except httpx.TimeoutException:
-        return {
-            "error": f"Timeout al obtener detalles del kata '{kata_id_or_slug}'. "
+    memoized = _KATA_MEMO.get(kata_id_or_slug)
+    if memoized is not None:
+        return memoized
+
+    cached = _load_cached_kata(kata_id_or_slug)
+    if cached is not None:
+        if time.time() - cached.get("cached_at", 0) < KATA_CACHE_TTL:
+            _KATA_MEMO[kata_id_or_slug] = cached["json"]
+            return cached["json"]
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = _request(
+        f"/code-challenges/{kata_id_or_slug}",
+        timeout_msg=(
+            f"Timeout al obtener detalles del kata '{kata_id_or_slug}'. "
             f"Intenta nuevamente."
-        }
-    except httpx.ConnectError:
-        return {
-            "error": "Error de conexión. Verifica tu conexión a internet."
-        }
-    except httpx.HTTPStatusError as e:
-        return {
-            "error": f"Error HTTP {e.response.status_code}: {e.response.text}"
-        }
-    except Exception as e:
-        return {
-            "error": f"Error inesperado al obtener detalles del kata: {e}"
-        }
\ No newline at end of file
+        ),
+        headers=headers,
+    )
+
+    if response.status_code == 304 and cached is not None:
+        # Not modified: refresh the cache stamp and reuse the body.
+        _store_cached_kata(
+            kata_id_or_slug,
+            cached.get("etag"),
+            cached["json"],
+            cached.get("last_modified"),
+        )
+        _KATA_MEMO[kata_id_or_slug] = cached["json"]
+        return cached["json"]
+
+    if response.status_code == 404:
+        raise CodeWarsAPIError(
+            f"Ejercicio '{kata_id_or_slug}' no encontrado.",
+            kind="notfound",
+        )
+
+    payload = _parse_json(response)
+    _store_cached_kata(
+        kata_id_or_slug,
+        response.headers.get("ETag"),
+        payload,
+        response.headers.get("Last-Modified"),
+    )
+    _KATA_MEMO[kata_id_or_slug] = payload
+    return payload
\ No newline at end of file
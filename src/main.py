@@ -13,7 +13,7 @@ from typing import Dict, Any, Optional, List, Set
 
 from mcp.server.fastmcp import FastMCP
 
-from api_client import fetch_kata_details, fetch_user_completed
+from api_client import CodeWarsAPIError, fetch_kata_details, fetch_user_completed
 
 mcp = FastMCP("Codewars Tutor")
 
@@ -105,17 +105,14 @@ def sync_history_internal(username: str) -> List[str]:
     """
     try:
         completed_katas_data = fetch_user_completed(username, page=0)
-        
-        if "error" in completed_katas_data:
-            return []
-            
+
         HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
         with open(HISTORY_PATH, "w", encoding="utf-8") as history_file:
-            json.dump(completed_katas_data, history_file, indent=2)
-            
+            json.dump(completed_katas_data, history_file, separators=(",", ":"))
+
         return [kata["id"] for kata in completed_katas_data]
-        
-    except (IOError, KeyError, TypeError) as e:
+
+    except (CodeWarsAPIError, IOError, KeyError, TypeError):
         return []
 
 
@@ -144,23 +141,20 @@ def update_progress(username: str = None) -> str:
             )
 
         completed_katas_data = fetch_user_completed(active_username, page=0)
-        
-        if "error" in completed_katas_data:
-            return (
-                f"❌ Error conectando con CodeWars: "
-                f"{completed_katas_data['error']}"
-            )
 
         HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
         with open(HISTORY_PATH, "w", encoding="utf-8") as history_file:
-            json.dump(completed_katas_data, history_file, indent=2)
-            
+            json.dump(completed_katas_data, history_file, separators=(",", ":"))
+
+
         kata_count = len(completed_katas_data)
         return (
             f"✅ Sincronización exitosa. Historial local actualizado "
             f"con {kata_count} ejercicios recientes."
         )
-        
+
+    except CodeWarsAPIError as e:
+        return f"❌ Error conectando con CodeWars: {e}"
     except IOError as e:
         return f"❌ Error de archivo al guardar historial: {e}"
     except Exception as e:
@@ -192,16 +186,16 @@ def import_kata(url_or_id: str) -> str:
             else url_or_id.strip()
         )
 
-        kata_details = fetch_kata_details(kata_id)
-        
-        if "error" in kata_details:
+        try:
+            kata_details = fetch_kata_details(kata_id)
+        except CodeWarsAPIError:
             return (
                 f"❌ No pude encontrar el ejercicio '{kata_id}'. "
                 "Verifica el ID o la URL."
             )
 
         return setup_exercise_environment(kata_details, origin="Importación Manual")
-        
+
     except re.error as e:
         return f"❌ Error al procesar la URL/ID: {e}"
     except Exception as e:
@@ -273,12 +267,12 @@ def practice_python() -> str:
 
         selected_kata_index = random.choice(available_katas)
         
-        kata_details = fetch_kata_details(selected_kata_index["id"])
-        
-        if "error" in kata_details:
+        try:
+            kata_details = fetch_kata_details(selected_kata_index["id"])
+        except CodeWarsAPIError as e:
             return (
                 f"❌ Hubo un error descargando el contenido del ejercicio "
-                f"'{selected_kata_index['name']}': {kata_details['error']}"
+                f"'{selected_kata_index['name']}': {e}"
             )
 
         return setup_exercise_environment(